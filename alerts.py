@@ -0,0 +1,189 @@
+import asyncio
+import logging
+import math
+import time
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from forecast import Forecast, HourlySeries
+
+# kind -> (default threshold, True if the alert fires when the value rises to the threshold)
+RULES = {
+    'rain': (70.0, True),    # chance of rain, %
+    'frost': (0.0, False),   # minimum temperature, °C
+    'swing': (10.0, True),   # max - min temperature, °C
+}
+# kind -> (lowest, highest) accepted threshold; swings are rounded to 0.1°C, so 0.1 is the smallest > 0
+LIMITS = {
+    'rain': (0.0, 100.0),
+    'frost': (-60.0, 60.0),
+    'swing': (0.1, 60.0),
+}
+HORIZON_HOURS = 12
+
+logger = logging.getLogger(__name__)
+
+
+def valid_threshold(kind: str, threshold: float) -> bool:
+    # NaN would break the sort order ThresholdIndex.crossed relies on
+    if kind not in LIMITS or not isinstance(threshold, (int, float)) or not math.isfinite(threshold):
+        return False
+    low, high = LIMITS[kind]
+    return low <= threshold <= high
+
+
+@dataclass(slots=True)
+class Alert:
+    user_id: int
+    location: str
+    kind: str
+    value: float
+
+
+class ThresholdIndex:
+    """Thresholds of one rule kind for one district, sorted so transitions are a range query."""
+
+    __slots__ = ('thresholds', 'user_ids')
+
+    def __init__(self):
+        self.thresholds: List[float] = []
+        self.user_ids: List[int] = []
+
+    def __len__(self):
+        return len(self.user_ids)
+
+    def add(self, user_id: int, threshold: float):
+        i = bisect_right(self.thresholds, threshold)
+        self.thresholds.insert(i, threshold)
+        self.user_ids.insert(i, user_id)
+
+    def remove(self, user_id: int):
+        try:
+            i = self.user_ids.index(user_id)
+        except ValueError:
+            return
+        del self.thresholds[i]
+        del self.user_ids[i]
+
+    def crossed(self, old: float, new: float, rising: bool) -> List[int]:
+        """Users whose rule was inactive at ``old`` and is active at ``new``."""
+        if rising:
+            # active <=> value >= threshold, i.e. the prefix up to bisect_right(value)
+            if new <= old:
+                return []
+            return self.user_ids[bisect_right(self.thresholds, old):bisect_right(self.thresholds, new)]
+        # active <=> value <= threshold, i.e. the suffix from bisect_left(value)
+        if new >= old:
+            return []
+        return self.user_ids[bisect_left(self.thresholds, new):bisect_left(self.thresholds, old)]
+
+
+def window_features(hourly: HourlySeries, now: float, horizon: int = HORIZON_HOURS) -> Optional[Dict[str, float]]:
+    # Start at the hour containing ``now``
+    start = bisect_right(hourly.time_epoch, int(now)) - 1
+    start = max(start, 0)
+    temps = hourly.temp_c[start:start + horizon]
+    if not temps:
+        return None
+    low, high = min(temps), max(temps)
+    return {
+        'rain': max(hourly.chance_of_rain[start:start + horizon]),
+        'frost': low,
+        'swing': round(high - low, 1),
+    }
+
+
+class AlertEngine:
+    """Turns forecast refreshes into alerts for the users subscribed to that district.
+
+    Only districts with subscribers are evaluated. Each evaluation compares the new
+    forecast window with the previous snapshot of the same district and enqueues an
+    alert only for users whose rule has just become active.
+    """
+
+    def __init__(self, horizon: int = HORIZON_HOURS):
+        self.horizon = horizon
+        self.queue: asyncio.Queue = asyncio.Queue()
+        # location -> kind -> ThresholdIndex
+        self._indexes: Dict[str, Dict[str, ThresholdIndex]] = {}
+        # user_id -> kind -> (location, threshold)
+        self._rules: Dict[int, Dict[str, tuple]] = {}
+        # location -> features of the last evaluated forecast
+        self._snapshots: Dict[str, Dict[str, float]] = {}
+
+    def load(self, rules: Iterable[tuple]):
+        for user_id, location, kind, threshold in rules:
+            try:
+                self.set_rule(user_id, location, kind, threshold)
+            except ValueError as e:
+                logger.error(f"Skipping alert rule of user {user_id}: {e}")
+
+    def locations(self) -> List[str]:
+        return list(self._indexes)
+
+    def rules_for(self, user_id: int) -> Dict[str, tuple]:
+        return self._rules.get(user_id, {})
+
+    def set_rule(self, user_id: int, location: str, kind: str, threshold: float):
+        if kind not in RULES:
+            raise ValueError(f"Unknown alert kind: {kind}")
+        if not valid_threshold(kind, threshold):
+            raise ValueError(f"Invalid {kind} threshold: {threshold}")
+        previous = self._rules.setdefault(user_id, {}).get(kind)
+        if previous:
+            self._discard(user_id, previous[0], kind)
+        self._rules[user_id][kind] = (location, threshold)
+        self._indexes.setdefault(location, {}).setdefault(kind, ThresholdIndex()).add(user_id, threshold)
+
+    def remove_user(self, user_id: int):
+        for kind, (location, _) in self._rules.pop(user_id, {}).items():
+            self._discard(user_id, location, kind)
+
+    def _discard(self, user_id: int, location: str, kind: str):
+        indexes = self._indexes.get(location, {})
+        index = indexes.get(kind)
+        if index is None:
+            return
+        index.remove(user_id)
+        if not index:
+            del indexes[kind]
+        if not indexes:
+            self._indexes.pop(location, None)
+            self._snapshots.pop(location, None)
+
+    def evaluate(self, location: str, forecast: Forecast, now: Optional[float] = None) -> List[Alert]:
+        indexes = self._indexes.get(location)
+        if not indexes:
+            return []
+        features = window_features(forecast.hourly, time.time() if now is None else now, self.horizon)
+        if features is None:
+            return []
+        previous = self._snapshots.get(location)
+        self._snapshots[location] = features
+        # The first snapshot of a district is a baseline: without it every restart would re-alert
+        if previous is None or previous == features:
+            return []
+
+        alerts = []
+        for kind, index in indexes.items():
+            rising = RULES[kind][1]
+            value = features[kind]
+            for user_id in index.crossed(previous[kind], value, rising):
+                alerts.append(Alert(user_id, location, kind, value))
+        return alerts
+
+    def on_forecast(self, location: str, forecast: Forecast):
+        for alert in self.evaluate(location, forecast):
+            self.queue.put_nowait(alert)
+
+
+def format_alert(alert: Alert, horizon: int = HORIZON_HOURS) -> str:
+    if alert.kind == 'rain':
+        return (f"🌧 <b>{alert.location}</b>: keyingi {horizon} soatda "
+                f"yog'ingarchilik ehtimoli {alert.value:.0f}%")
+    if alert.kind == 'frost':
+        return (f"❄️ <b>{alert.location}</b>: keyingi {horizon} soatda "
+                f"harorat {alert.value}°C gacha pasayadi")
+    return (f"🌡 <b>{alert.location}</b>: keyingi {horizon} soatda "
+            f"harorat {alert.value}°C ga keskin o'zgaradi")
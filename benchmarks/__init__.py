@@ -0,0 +1,4 @@
+"""Offline benchmarks for the weather bot.
+
+Run the load test with ``python -m benchmarks.load_test --help``.
+"""
@@ -0,0 +1,63 @@
+"""Alert engine evaluation benchmark.
+
+Spreads subscribers with random thresholds across all districts, then times one
+refresh of ``--changed`` districts. Cost should follow the number of changed
+districts and fired alerts, not the number of subscribers.
+
+    python -m benchmarks.alerts --users 10000 100000 1000000 --changed 10
+"""
+import argparse
+import gc
+import random
+import sys
+import time
+
+from alerts import RULES, AlertEngine
+from benchmarks.common import ALL_DISTRICTS
+from benchmarks.fakes import make_forecast_payload
+from forecast import parse_forecast
+
+THRESHOLD_RANGES = {'rain': (30, 100), 'frost': (-10, 10), 'swing': (5, 20)}
+
+
+def build_engine(users: int, seed: int) -> AlertEngine:
+    rnd = random.Random(seed)
+    engine = AlertEngine()
+    for user_id in range(1, users + 1):
+        location = rnd.choice(ALL_DISTRICTS)
+        for kind in RULES:
+            low, high = THRESHOLD_RANGES[kind]
+            engine.set_rule(user_id, location, kind, round(rnd.uniform(low, high), 1))
+    return engine
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--changed', type=int, default=10, help="districts refreshed per round")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    changed = ALL_DISTRICTS[:args.changed]
+    before = {location: parse_forecast(location, make_forecast_payload(location, 2, seed=1)) for location in changed}
+    after = {location: parse_forecast(location, make_forecast_payload(location, 2, seed=2)) for location in changed}
+    now = next(iter(before.values())).hourly.time_epoch[0]
+
+    print(f"{'users':>10}{'changed':>9}{'alerts':>9}{'ms/refresh':>12}{'us/district':>13}")
+    for users in args.users:
+        engine = build_engine(users, args.seed)
+        # Keep full collections over the rule objects out of the timed section
+        gc.collect()
+        gc.freeze()
+        for location, forecast in before.items():
+            engine.evaluate(location, forecast, now)
+
+        started = time.perf_counter()
+        fired = sum(len(engine.evaluate(location, forecast, now)) for location, forecast in after.items())
+        elapsed = time.perf_counter() - started
+        gc.unfreeze()
+        print(f"{users:>10}{len(changed):>9}{fired:>9}{elapsed * 1000:>12.3f}{elapsed / len(changed) * 1e6:>13.1f}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
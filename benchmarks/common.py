@@ -0,0 +1,16 @@
+"""Helpers shared by the benchmarks; keep this free of aiogram and aiohttp imports."""
+import math
+from typing import List
+
+from regions import UZBEKISTAN_REGIONS
+
+ALL_DISTRICTS = [district for districts in UZBEKISTAN_REGIONS.values() for district in districts]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    # Nearest-rank: the smallest value with at least pct% of the samples at or below it
+    index = max(0, min(len(ordered) - 1, math.ceil(pct * len(ordered) / 100) - 1))
+    return ordered[index]
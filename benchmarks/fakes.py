@@ -0,0 +1,231 @@
+"""Fake upstreams for offline benchmarks: a weatherapi.com server and a Telegram session."""
+import asyncio
+import random
+import socket
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, AsyncGenerator, Dict, Optional
+
+from aiohttp import web
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import SendMessage
+from aiogram.types import Chat, Message
+
+CONDITIONS = [
+    (1000, 'Sunny'),
+    (1003, 'Partly cloudy'),
+    (1006, 'Cloudy'),
+    (1009, 'Overcast'),
+    (1030, 'Mist'),
+    (1063, 'Patchy rain possible'),
+    (1183, 'Light rain'),
+    (1195, 'Heavy rain'),
+    (1213, 'Light snow'),
+    (1273, 'Patchy light rain with thunder'),
+]
+
+
+def _condition(rnd: random.Random) -> dict:
+    code, text = rnd.choice(CONDITIONS)
+    return {'text': text, 'icon': f"//cdn.weatherapi.com/weather/64x64/day/{code % 1000}.png", 'code': code}
+
+
+def _hour(rnd: random.Random, when: datetime, base_temp: float) -> dict:
+    temp = round(base_temp + rnd.uniform(-6, 6), 1)
+    wind = round(rnd.uniform(0, 30), 1)
+    return {
+        'time_epoch': int(when.timestamp()),
+        'time': when.strftime('%Y-%m-%d %H:%M'),
+        'temp_c': temp,
+        'temp_f': round(temp * 9 / 5 + 32, 1),
+        'is_day': int(6 <= when.hour < 19),
+        'condition': _condition(rnd),
+        'wind_mph': round(wind / 1.609, 1),
+        'wind_kph': wind,
+        'wind_degree': rnd.randint(0, 359),
+        'wind_dir': rnd.choice(['N', 'NE', 'E', 'SE', 'S', 'SW', 'W', 'NW']),
+        'pressure_mb': float(rnd.randint(1000, 1030)),
+        'pressure_in': round(rnd.uniform(29.5, 30.4), 2),
+        'precip_mm': round(rnd.uniform(0, 3), 2),
+        'precip_in': round(rnd.uniform(0, 0.1), 2),
+        'snow_cm': 0.0,
+        'humidity': rnd.randint(10, 100),
+        'cloud': rnd.randint(0, 100),
+        'feelslike_c': round(temp - rnd.uniform(0, 3), 1),
+        'feelslike_f': round((temp - 1) * 9 / 5 + 32, 1),
+        'windchill_c': round(temp - 2, 1),
+        'windchill_f': round((temp - 2) * 9 / 5 + 32, 1),
+        'heatindex_c': round(temp + 1, 1),
+        'heatindex_f': round((temp + 1) * 9 / 5 + 32, 1),
+        'dewpoint_c': round(temp - 8, 1),
+        'dewpoint_f': round((temp - 8) * 9 / 5 + 32, 1),
+        'will_it_rain': rnd.randint(0, 1),
+        'chance_of_rain': rnd.randint(0, 100),
+        'will_it_snow': 0,
+        'chance_of_snow': 0,
+        'vis_km': 10.0,
+        'vis_miles': 6.0,
+        'gust_mph': round(wind / 1.2, 1),
+        'gust_kph': round(wind * 1.3, 1),
+        'uv': round(rnd.uniform(0, 9), 1),
+    }
+
+
+def make_location(name: str) -> dict:
+    return {
+        'name': name,
+        'region': 'Toshkent',
+        'country': 'Uzbekistan',
+        'lat': 41.3,
+        'lon': 69.25,
+        'tz_id': 'Asia/Tashkent',
+        'localtime_epoch': int(datetime.now(timezone.utc).timestamp()),
+        'localtime': datetime.now().strftime('%Y-%m-%d %H:%M'),
+    }
+
+
+def make_current_payload(location: str, seed: Optional[int] = None) -> dict:
+    rnd = random.Random(seed if seed is not None else location)
+    current = _hour(rnd, datetime.now().replace(minute=0, second=0, microsecond=0), 20.0)
+    for key in ('time_epoch', 'time', 'will_it_rain', 'chance_of_rain', 'will_it_snow', 'chance_of_snow'):
+        current.pop(key)
+    current['last_updated'] = datetime.now().strftime('%Y-%m-%d %H:%M')
+    current['last_updated_epoch'] = int(datetime.now(timezone.utc).timestamp())
+    return {'location': make_location(location), 'current': current}
+
+
+def make_forecast_payload(location: str, days: int = 7, seed: Optional[int] = None) -> dict:
+    """Build a forecast.json body shaped like weatherapi's, with every field the API returns."""
+    rnd = random.Random(seed if seed is not None else location)
+    payload = make_current_payload(location, rnd.randint(0, 2 ** 31))
+    forecastday = []
+    start = date.today()
+    for i in range(days):
+        day = start + timedelta(days=i)
+        midnight = datetime(day.year, day.month, day.day)
+        base_temp = rnd.uniform(5, 30)
+        hours = [_hour(rnd, midnight + timedelta(hours=h), base_temp) for h in range(24)]
+        temps = [h['temp_c'] for h in hours]
+        forecastday.append({
+            'date': day.isoformat(),
+            'date_epoch': int(midnight.timestamp()),
+            'day': {
+                'maxtemp_c': max(temps),
+                'maxtemp_f': round(max(temps) * 9 / 5 + 32, 1),
+                'mintemp_c': min(temps),
+                'mintemp_f': round(min(temps) * 9 / 5 + 32, 1),
+                'avgtemp_c': round(sum(temps) / len(temps), 1),
+                'avgtemp_f': round(sum(temps) / len(temps) * 9 / 5 + 32, 1),
+                'maxwind_mph': max(h['wind_mph'] for h in hours),
+                'maxwind_kph': max(h['wind_kph'] for h in hours),
+                'totalprecip_mm': round(sum(h['precip_mm'] for h in hours), 2),
+                'totalprecip_in': round(sum(h['precip_in'] for h in hours), 2),
+                'totalsnow_cm': 0.0,
+                'avgvis_km': 10.0,
+                'avgvis_miles': 6.0,
+                'avghumidity': sum(h['humidity'] for h in hours) // 24,
+                'daily_will_it_rain': int(any(h['will_it_rain'] for h in hours)),
+                'daily_chance_of_rain': max(h['chance_of_rain'] for h in hours),
+                'daily_will_it_snow': 0,
+                'daily_chance_of_snow': 0,
+                'condition': _condition(rnd),
+                'uv': round(rnd.uniform(0, 9), 1),
+            },
+            'astro': {
+                'sunrise': '06:45 AM',
+                'sunset': '06:10 PM',
+                'moonrise': '09:12 PM',
+                'moonset': '11:03 AM',
+                'moon_phase': 'Waning Gibbous',
+                'moon_illumination': rnd.randint(0, 100),
+                'is_moon_up': 0,
+                'is_sun_up': 0,
+            },
+            'hour': hours,
+        })
+    payload['forecast'] = {'forecastday': forecastday}
+    return payload
+
+
+class FakeWeatherAPI:
+    """weatherapi.com stand-in serving ``current.json`` and ``forecast.json`` on localhost."""
+
+    def __init__(self, latency: float = 0.05, jitter: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.calls = Counter()
+        self._rnd = random.Random(seed)
+        self._runner: Optional[web.AppRunner] = None
+        self.url: Optional[str] = None
+
+    async def _delay(self):
+        delay = self.latency + (self._rnd.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def current(self, request: web.Request) -> web.Response:
+        self.calls['current'] += 1
+        await self._delay()
+        return web.json_response(make_current_payload(request.query.get('q', '')))
+
+    async def forecast(self, request: web.Request) -> web.Response:
+        self.calls['forecast'] += 1
+        await self._delay()
+        location = request.query.get('q', '')
+        days = int(request.query.get('days', 1))
+        return web.json_response(make_forecast_payload(location, days))
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_get('/v1/current.json', self.current)
+        app.router.add_get('/v1/forecast.json', self.forecast)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind(('127.0.0.1', 0))
+        site = web.SockSite(self._runner, sock)
+        await site.start()
+        self.url = f"http://127.0.0.1:{sock.getsockname()[1]}/v1"
+        return self.url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+class FakeTelegramSession(BaseSession):
+    """Bot API session that answers every method locally after ``latency`` seconds."""
+
+    def __init__(self, latency: float = 0.0, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.latency = latency
+        self.calls = Counter()
+        self._message_id = 0
+
+    async def make_request(self, bot, method, timeout: Optional[int] = None):
+        self.calls[type(method).__name__] += 1
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+        if isinstance(method, SendMessage):
+            self._message_id += 1
+            return Message(
+                message_id=self._message_id,
+                date=datetime.now(timezone.utc),
+                chat=Chat(id=method.chat_id, type='private'),
+                text=method.text,
+            )
+        return True
+
+    async def stream_content(
+        self,
+        url: str,
+        headers: Optional[Dict[str, Any]] = None,
+        timeout: int = 30,
+        chunk_size: int = 65536,
+        raise_for_status: bool = True,
+    ) -> AsyncGenerator[bytes, None]:
+        yield b''
+
+    async def close(self):
+        pass
@@ -0,0 +1,219 @@
+"""Offline replay load test for the bot handlers.
+
+Drives ``dp.feed_update`` with a synthetic stream (or a recorded JSONL trace) against
+a local fake weatherapi server, a fake Telegram session and a throwaway SQLite
+database, then reports throughput and per-handler latency, upstream calls and
+DB queries per update.
+
+    python -m benchmarks.load_test --users 200 --events 10 --upstream-latency 0.05
+    python -m benchmarks.load_test --trace trace.jsonl
+"""
+import argparse
+import asyncio
+import contextvars
+import logging
+import os
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import List, Optional
+
+from benchmarks.common import percentile
+from benchmarks.fakes import FakeTelegramSession, FakeWeatherAPI
+from benchmarks.workload import dump_trace, event_user, load_trace, synthetic_workload, to_update
+
+
+BOT_TOKEN = '123456:bench-token'
+
+logger = logging.getLogger(__name__)
+
+
+class UpdateStats:
+    __slots__ = ('handler', 'upstream_calls', 'db_queries', 'elapsed', 'failed')
+
+    def __init__(self):
+        self.handler = 'unhandled'
+        self.failed = False
+        self.upstream_calls = 0
+        self.db_queries = 0
+        self.elapsed = 0.0
+
+
+current_stats: contextvars.ContextVar[Optional[UpdateStats]] = contextvars.ContextVar('current_stats', default=None)
+
+
+async def handler_name_middleware(handler, event, data):
+    stats = current_stats.get()
+    if stats is not None:
+        stats.handler = data['handler'].callback.__name__
+    return await handler(event, data)
+
+
+def instrument(app):
+    """Attach per-update counters to an application: handler names, upstream calls, DB queries."""
+    from sqlalchemy import event
+
+    app.dp.message.middleware(handler_name_middleware)
+    app.dp.callback_query.middleware(handler_name_middleware)
+    app.dp.inline_query.middleware(handler_name_middleware)
+
+    fetch_weather = app.weather.fetch_weather
+
+    async def counted_fetch_weather(*args, **kwargs):
+        stats = current_stats.get()
+        if stats is not None:
+            stats.upstream_calls += 1
+        return await fetch_weather(*args, **kwargs)
+
+    app.weather.fetch_weather = counted_fetch_weather
+
+    def count_query(*args):
+        stats = current_stats.get()
+        if stats is not None:
+            stats.db_queries += 1
+
+    event.listen(app.engine.sync_engine, 'before_cursor_execute', count_query)
+
+
+def build_app(weather_url: str, database_url: str):
+    from main import Config, create_app
+
+    logging.basicConfig(level=logging.WARNING)
+    return create_app(Config(
+        bot_token=BOT_TOKEN,
+        database_url=database_url,
+        weather_api_key='bench',
+        weather_api_url=weather_url,
+        database_echo=False,
+    ))
+
+
+async def run(args) -> dict:
+    if args.trace:
+        events, skipped = load_trace(args.trace)
+    else:
+        events, skipped = synthetic_workload(args.users, args.events, seed=args.seed), 0
+    if args.dump_trace:
+        dump_trace(events, args.dump_trace)
+
+    weather_api = FakeWeatherAPI(latency=args.upstream_latency, jitter=args.upstream_jitter, seed=args.seed)
+    weather_url = await weather_api.start()
+    tmpdir = tempfile.TemporaryDirectory()
+    app = build_app(weather_url, f"sqlite+aiosqlite:///{os.path.join(tmpdir.name, 'bench.db')}")
+    instrument(app)
+    await app.db.init_db()
+
+    from aiogram import Bot
+    telegram = FakeTelegramSession(latency=args.telegram_latency)
+    bot = Bot(token=BOT_TOKEN, session=telegram)
+
+    sessions = defaultdict(list)
+    for event in events:
+        sessions[event_user(event)].append(event)
+
+    results: List[UpdateStats] = []
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def feed(event):
+        stats = UpdateStats()
+        current_stats.set(stats)
+        started = time.perf_counter()
+        # One bad update is counted against its handler instead of aborting the whole replay
+        try:
+            await app.dp.feed_update(bot, to_update(event, bot))
+        except Exception as e:
+            stats.failed = True
+            logger.warning(f"Update failed in {stats.handler}: {e!r}")
+        stats.elapsed = time.perf_counter() - started
+        results.append(stats)
+
+    async def replay_user(user_events):
+        async with semaphore:
+            for event in user_events:
+                await feed(event)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(replay_user(user_events) for user_events in sessions.values()))
+    wall = time.perf_counter() - started
+    # Inline queries warm the cache in the background; let those finish before the fake API stops
+    await app.weather.drain()
+
+    await bot.session.close()
+    await weather_api.stop()
+    await app.engine.dispose()
+    tmpdir.cleanup()
+
+    return summarize(results, wall, skipped, weather_api, telegram)
+
+
+def summarize(results: List[UpdateStats], wall: float, skipped: int, weather_api, telegram) -> dict:
+    by_handler = defaultdict(list)
+    for stats in results:
+        by_handler[stats.handler].append(stats)
+
+    handlers = {}
+    for name, items in sorted(by_handler.items(), key=lambda item: -len(item[1])):
+        latencies = [s.elapsed * 1000 for s in items]
+        handlers[name] = {
+            'count': len(items),
+            'p50_ms': percentile(latencies, 50),
+            'p95_ms': percentile(latencies, 95),
+            'p99_ms': percentile(latencies, 99),
+            'upstream_per_update': sum(s.upstream_calls for s in items) / len(items),
+            'db_per_update': sum(s.db_queries for s in items) / len(items),
+            'errors': sum(s.failed for s in items),
+        }
+
+    total = len(results) or 1
+    return {
+        'updates': len(results),
+        'skipped_trace_lines': skipped,
+        'wall_s': wall,
+        'throughput_ups': len(results) / wall if wall else 0.0,
+        'upstream_per_update': sum(s.upstream_calls for s in results) / total,
+        'db_per_update': sum(s.db_queries for s in results) / total,
+        'errors': sum(s.failed for s in results),
+        'upstream_calls': dict(weather_api.calls),
+        'telegram_calls': dict(telegram.calls),
+        'handlers': handlers,
+    }
+
+
+def print_report(report: dict):
+    print(f"updates: {report['updates']}  (skipped trace lines: {report['skipped_trace_lines']})")
+    print(f"wall: {report['wall_s']:.2f}s  throughput: {report['throughput_ups']:.1f} updates/s")
+    print(f"upstream calls/update: {report['upstream_per_update']:.2f}  {report['upstream_calls']}")
+    print(f"db queries/update: {report['db_per_update']:.2f}")
+    print(f"failed updates: {report['errors']}")
+    print(f"telegram calls: {report['telegram_calls']}")
+    print()
+    print(f"{'handler':<28}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'upstream':>10}{'db':>7}{'errors':>8}")
+    for name, row in report['handlers'].items():
+        print(
+            f"{name:<28}{row['count']:>7}{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}"
+            f"{row['upstream_per_update']:>10.2f}{row['db_per_update']:>7.2f}{row['errors']:>8}"
+        )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=100, help="simulated users")
+    parser.add_argument('--events', type=int, default=10, help="events per user")
+    parser.add_argument('--concurrency', type=int, default=50, help="users in flight at once")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--upstream-latency', type=float, default=0.05, help="weatherapi latency, seconds")
+    parser.add_argument('--upstream-jitter', type=float, default=0.0, help="extra random latency, seconds")
+    parser.add_argument('--telegram-latency', type=float, default=0.0, help="Bot API latency, seconds")
+    parser.add_argument('--trace', help="replay a JSONL trace instead of a synthetic stream")
+    parser.add_argument('--dump-trace', help="write the workload to this JSONL file")
+    return parser.parse_args(argv)
+
+
+def cli(argv=None):
+    args = parse_args(argv)
+    print_report(asyncio.run(run(args)))
+
+
+if __name__ == '__main__':
+    sys.exit(cli())
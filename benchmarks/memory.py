@@ -0,0 +1,61 @@
+"""Memory and decode-time benchmark for cached forecasts.
+
+Compares keeping the raw weatherapi JSON per district with keeping the parsed
+``forecast.Forecast`` model, using synthetic 7-day forecast.json bodies.
+
+    python -m benchmarks.memory --locations 200
+"""
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+from benchmarks.common import ALL_DISTRICTS
+from benchmarks.fakes import make_forecast_payload
+from forecast import loads, parse_forecast
+
+
+def measure(build, bodies) -> tuple:
+    """Return (bytes retained per location, seconds per location) for building a cache."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    cache = {location: build(location, body) for location, body in bodies}
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del cache
+    return retained / len(bodies), elapsed / len(bodies)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--locations', type=int, default=len(ALL_DISTRICTS))
+    parser.add_argument('--days', type=int, default=7)
+    args = parser.parse_args(argv)
+
+    locations = [ALL_DISTRICTS[i % len(ALL_DISTRICTS)] + ('' if i < len(ALL_DISTRICTS) else f" #{i}")
+                 for i in range(args.locations)]
+    bodies = [(location, json.dumps(make_forecast_payload(location, args.days)).encode())
+              for location in locations]
+    body_size = sum(len(body) for _, body in bodies) / len(bodies)
+
+    variants = [
+        ('raw dict, json', lambda location, body: json.loads(body)),
+        ('raw dict, fast loads', lambda location, body: loads(body)),
+        ('parsed Forecast', lambda location, body: parse_forecast(location, loads(body))),
+    ]
+    print(f"{args.locations} locations, {args.days} days, {body_size / 1024:.1f} KiB JSON per location "
+          f"(fast loads: {getattr(loads, '__module__', 'json')})")
+    print(f"{'variant':<24}{'KiB/location':>14}{'ms/location':>14}")
+    for name, build in variants:
+        per_location, seconds = measure(build, bodies)
+        print(f"{name:<24}{per_location / 1024:>14.1f}{seconds * 1000:>14.3f}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""District search benchmark for inline queries.
+
+Times ``DistrictIndex.search`` over every prefix of every district name (as typed,
+and with apostrophes dropped) plus mid-word fragments, against a linear scan.
+
+    python -m benchmarks.search --repeat 5
+"""
+import argparse
+import sys
+import time
+
+from benchmarks.common import percentile
+from regions import UZBEKISTAN_REGIONS
+from search import DistrictIndex, normalize
+
+
+def linear_search(regions: dict, query: str, limit: int = 20) -> list:
+    query = normalize(query)
+    return [(district, region) for region, districts in regions.items() for district in districts
+            if query in normalize(district)][:limit]
+
+
+def make_queries() -> list:
+    queries = []
+    for districts in UZBEKISTAN_REGIONS.values():
+        for district in districts:
+            for end in range(1, len(district) + 1):
+                queries.append(district[:end])
+                queries.append(district[:end].replace("'", "").lower())
+            if len(district) > 5:
+                queries.append(district[2:5])
+    return queries
+
+
+def time_lookups(search, queries: list, repeat: int) -> list:
+    samples = []
+    for _ in range(repeat):
+        for query in queries:
+            started = time.perf_counter_ns()
+            search(query)
+            samples.append((time.perf_counter_ns() - started) / 1000)
+    return samples
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    index = DistrictIndex(UZBEKISTAN_REGIONS)
+    print(f"index build: {(time.perf_counter() - started) * 1000:.2f} ms for {len(index.entries)} districts")
+
+    queries = make_queries()
+    variants = [
+        ('DistrictIndex', index.search),
+        ('linear scan', lambda query: linear_search(UZBEKISTAN_REGIONS, query)),
+    ]
+    print(f"{len(queries)} queries x {args.repeat}")
+    print(f"{'variant':<16}{'p50 us':>10}{'p95 us':>10}{'p99 us':>10}")
+    for name, search in variants:
+        samples = time_lookups(search, queries, args.repeat)
+        print(f"{name:<16}{percentile(samples, 50):>10.1f}{percentile(samples, 95):>10.1f}"
+              f"{percentile(samples, 99):>10.1f}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""Cold-start benchmark for the bot.
+
+Runs each startup stage in a fresh interpreter under ``-X importtime`` and reports the
+median wall time, total import time and the heaviest top-level imports.
+
+    python -m benchmarks.startup --repeat 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_APP = (
+    "import main; "
+    "app = main.create_app(main.Config(bot_token='123456:bench-token', database_url='sqlite+aiosqlite://')); "
+)
+
+STAGES = {
+    'import': "import main",
+    'dispatcher': _APP + "app.dp",
+    'full': _APP + "app.engine; app.bot; app.dp; app.scheduler",
+}
+
+
+def parse_importtime(stderr: str) -> dict:
+    """Map top-level module name -> cumulative import time in microseconds."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not name.startswith('  '):
+            modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def run_stage(code: str) -> tuple:
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    return time.perf_counter() - started, parse_importtime(result.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=8, help="heaviest imports to list per stage")
+    parser.add_argument('--stage', choices=list(STAGES), action='append', help="default: all stages")
+    args = parser.parse_args(argv)
+
+    # Warm-up run so the first measured sample doesn't include bytecode compilation.
+    run_stage(STAGES['full'])
+
+    for stage in args.stage or STAGES:
+        walls, totals, per_module = [], [], defaultdict(list)
+        for _ in range(args.repeat):
+            wall, modules = run_stage(STAGES[stage])
+            walls.append(wall)
+            totals.append(sum(modules.values()))
+            for name, cumulative in modules.items():
+                per_module[name].append(cumulative)
+
+        print(f"{stage}: wall {statistics.median(walls) * 1000:.0f} ms, "
+              f"imports {statistics.median(totals) / 1000:.0f} ms (median of {args.repeat})")
+        heaviest = sorted(per_module.items(), key=lambda item: -statistics.median(item[1]))[:args.top]
+        for name, samples in heaviest:
+            print(f"    {statistics.median(samples) / 1000:8.1f} ms  {name}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
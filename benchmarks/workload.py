@@ -0,0 +1,181 @@
+"""Synthetic and recorded workloads for the load test.
+
+A workload is a list of events. Each event is a dict with ``user_id``, ``kind`` and an
+optional ``arg``; ``to_update`` turns it into a Telegram ``Update``. Traces are JSONL
+files holding either such events or raw Telegram update objects (anything with an
+``update_id`` that parses as an ``Update``); other lines, and events whose ``arg``
+doesn't fit their kind, are skipped and counted.
+"""
+import itertools
+import json
+import random
+import time
+from typing import Iterable, List, Tuple
+
+from aiogram.types import Update
+
+from benchmarks.common import ALL_DISTRICTS
+
+# kind -> relative weight in synthetic streams (after each user's first district pick)
+DEFAULT_MIX = {
+    'district': 2,
+    'check': 2,
+    'refresh': 4,
+    'toggle': 1,
+    'notif_time': 1,
+    'start': 1,
+    'alerts': 1,
+    'inline': 2,
+}
+
+BOT_USER = {'id': 123456, 'is_bot': True, 'first_name': 'Ob-havo'}
+
+_update_ids = itertools.count(1)
+_message_ids = itertools.count(1)
+
+
+def _user(user_id: int) -> dict:
+    return {'id': user_id, 'is_bot': False, 'first_name': f"User{user_id}"}
+
+
+def _message(user_id: int, text: str, from_bot: bool = False) -> dict:
+    return {
+        'message_id': next(_message_ids),
+        'date': int(time.time()),
+        'chat': {'id': user_id, 'type': 'private'},
+        'from': BOT_USER if from_bot else _user(user_id),
+        'text': text,
+    }
+
+
+def _callback(user_id: int, data: str) -> dict:
+    return {
+        'id': str(next(_update_ids)),
+        'from': _user(user_id),
+        'chat_instance': 'bench',
+        'data': data,
+        'message': _message(user_id, 'weather', from_bot=True),
+    }
+
+
+REFRESH_ACTIONS = ('current', 'hourly', 'weekly')
+
+
+def is_replayable(event: dict) -> bool:
+    """Check an event before replay: malformed callback data would abort the whole run."""
+    if 'update_id' in event:
+        # Raw Telegram updates must at least parse, or event_user and to_update fail on them
+        try:
+            Update.model_validate(event)
+        except ValueError:
+            return False
+        return True
+    if not isinstance(event.get('user_id'), int):
+        return False
+    kind, arg = event.get('kind'), event.get('arg')
+    if kind in ('check', 'toggle', 'alerts', 'start'):
+        return True
+    if kind in ('district', 'inline', 'text'):
+        return isinstance(arg, str)
+    if kind == 'refresh':
+        # update_weather_callback unpacks exactly "action:location"
+        if not isinstance(arg, str):
+            return False
+        action, _, location = arg.partition(':')
+        return action in REFRESH_ACTIONS and bool(location) and ':' not in location
+    if kind == 'notif_time':
+        return arg == 'cancel' or (isinstance(arg, str) and arg.isdigit() and int(arg) < 24)
+    return False
+
+
+def to_update(event: dict, bot=None) -> Update:
+    if 'update_id' in event:
+        raw = event
+    else:
+        if not is_replayable(event):
+            raise ValueError(f"Event can't be replayed: {event}")
+        user_id, kind, arg = event['user_id'], event['kind'], event.get('arg')
+        raw = {'update_id': next(_update_ids)}
+        if kind == 'district':
+            raw['message'] = _message(user_id, f"🏘 {arg}")
+        elif kind == 'check':
+            raw['message'] = _message(user_id, "🌤 Ob-havo tekshirish")
+        elif kind == 'toggle':
+            raw['message'] = _message(user_id, "🔔 Bildirishnomalar ❌")
+        elif kind == 'alerts':
+            raw['message'] = _message(user_id, "⚠️ Ogohlantirishlar")
+        elif kind == 'start':
+            raw['message'] = _message(user_id, "/start")
+        elif kind == 'refresh':
+            raw['callback_query'] = _callback(user_id, f"update_weather:{arg}")
+        elif kind == 'notif_time':
+            raw['callback_query'] = _callback(user_id, f"notif_time:{arg}")
+        elif kind == 'inline':
+            raw['inline_query'] = {'id': str(next(_update_ids)), 'from': _user(user_id), 'query': arg, 'offset': ''}
+        elif kind == 'text':
+            raw['message'] = _message(user_id, arg)
+        else:
+            raise ValueError(f"Unknown event kind: {kind}")
+    return Update.model_validate(raw, context={'bot': bot} if bot is not None else None)
+
+
+def synthetic_workload(users: int, events_per_user: int, seed: int = 0, mix: dict = None) -> List[dict]:
+    """Interleaved per-user sessions: a district pick first, then a weighted mix of actions."""
+    rnd = random.Random(seed)
+    mix = mix or DEFAULT_MIX
+    kinds, weights = list(mix), list(mix.values())
+    sessions = []
+    for user_id in range(1, users + 1):
+        district = rnd.choice(ALL_DISTRICTS)
+        events = [{'user_id': user_id, 'kind': 'district', 'arg': district}]
+        for kind in rnd.choices(kinds, weights, k=max(events_per_user - 1, 0)):
+            arg = None
+            if kind == 'district':
+                district = rnd.choice(ALL_DISTRICTS)
+                arg = district
+            elif kind == 'refresh':
+                arg = f"{rnd.choice(REFRESH_ACTIONS)}:{district}"
+            elif kind == 'notif_time':
+                arg = str(rnd.randrange(24))
+            elif kind == 'inline':
+                name = rnd.choice(ALL_DISTRICTS)
+                arg = name[:rnd.randint(1, len(name))]
+            events.append({'user_id': user_id, 'kind': kind, 'arg': arg})
+        sessions.append(events)
+    workload = []
+    for step in itertools.zip_longest(*sessions):
+        workload.extend(event for event in step if event is not None)
+    return workload
+
+
+def load_trace(path: str) -> Tuple[List[dict], int]:
+    """Read a JSONL trace, returning the replayable events and the number of skipped lines."""
+    events, skipped = [], 0
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                skipped += 1
+                continue
+            if isinstance(record, dict) and is_replayable(record):
+                events.append(record)
+            else:
+                skipped += 1
+    return events, skipped
+
+
+def dump_trace(events: Iterable[dict], path: str):
+    with open(path, 'w', encoding='utf-8') as f:
+        for event in events:
+            f.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+
+def event_user(event: dict) -> int:
+    if 'user_id' in event:
+        return event['user_id']
+    body = event.get('message') or event.get('callback_query') or event.get('inline_query') or {}
+    return (body.get('from') or body.get('chat') or {}).get('id', 0)
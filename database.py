@@ -0,0 +1,174 @@
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, select, update, delete
+from sqlalchemy.orm import declarative_base
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+Base = declarative_base()
+
+
+# Update the WeatherLog model to include notification settings
+class WeatherLog(Base):
+    __tablename__ = 'weather_logs'
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    location = Column(String, nullable=False)
+    temperature = Column(Float, nullable=False)
+    weather_desc = Column(String, nullable=False)
+    request_time = Column(DateTime, default=datetime.utcnow)
+    notifications_enabled = Column(Boolean, default=False)
+    notification_time = Column(Integer)
+
+
+class AlertRule(Base):
+    __tablename__ = 'alert_rules'
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    location = Column(String, nullable=False)
+    kind = Column(String, nullable=False)
+    threshold = Column(Float, nullable=False)
+
+
+class DatabaseManager:
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self.async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def init_db(self):
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    async def log_weather_request(self, user_id: int, location: str, temperature: float, weather_desc: str):
+        async with self.async_session() as session:
+            async with session.begin():
+                log = WeatherLog(
+                    user_id=user_id,
+                    location=location,
+                    temperature=temperature,
+                    weather_desc=weather_desc
+                )
+                session.add(log)
+
+    async def toggle_notifications(self, user_id: int):
+        async with self.async_session() as session:
+            async with session.begin():
+                stmt = select(WeatherLog).where(WeatherLog.user_id == user_id).order_by(WeatherLog.request_time.desc())
+                result = await session.execute(stmt)
+                weather_log = result.scalars().first()
+
+                if weather_log:
+                    new_state = not weather_log.notifications_enabled
+                    await session.execute(
+                        update(WeatherLog)
+                        .where(WeatherLog.user_id == user_id)
+                        .values(notifications_enabled=new_state)
+                    )
+                    return new_state
+                return False
+
+    async def get_notification_status(self, user_id: int):
+        async with self.async_session() as session:
+            # Get the most recent log entry for the user
+            subquery = (
+                select(WeatherLog.id)
+                .where(WeatherLog.user_id == user_id)
+                .order_by(WeatherLog.request_time.desc())
+                .limit(1)
+                .scalar_subquery()
+            )
+
+
+            stmt = (
+                select(WeatherLog.notifications_enabled)
+                .where(WeatherLog.id == subquery)
+            )
+
+            result = await session.execute(stmt)
+            status = result.scalar_one_or_none()
+            return status if status is not None else False
+
+    async def get_users_for_notifications(self):
+        async with self.async_session() as session:
+            stmt = (
+                select(WeatherLog.user_id, WeatherLog.location)
+                .where(WeatherLog.notifications_enabled == True)
+                .group_by(WeatherLog.user_id, WeatherLog.location)
+                .order_by(WeatherLog.request_time.desc())
+            )
+            result = await session.execute(stmt)
+            return result.fetchall()
+
+    async def get_users_for_hour(self, hour: int):
+        async with self.async_session() as session:
+            # Get all users who have notifications enabled for the given hour
+            stmt = (
+                select(WeatherLog.user_id, WeatherLog.location)
+                .where(
+                    WeatherLog.notifications_enabled == True,
+                    WeatherLog.notification_time == hour
+                )
+                .group_by(WeatherLog.user_id, WeatherLog.location)
+            )
+            result = await session.execute(stmt)
+            return result.fetchall()
+
+    async def set_notification_time(self, user_id: int, hour: int):
+        async with self.async_session() as session:
+            async with session.begin():
+                stmt = select(WeatherLog).where(WeatherLog.user_id == user_id).order_by(WeatherLog.request_time.desc())
+                result = await session.execute(stmt)
+                weather_log = result.scalars().first()
+
+                if weather_log:
+                    await session.execute(
+                        update(WeatherLog)
+                        .where(WeatherLog.user_id == user_id)
+                        .values(notifications_enabled=True, notification_time=hour)
+                    )
+                    return True
+                return False
+
+    async def get_notification_time(self, user_id: int):
+        async with self.async_session() as session:
+            subquery = (
+                select(WeatherLog.id)
+                .where(WeatherLog.user_id == user_id)
+                .order_by(WeatherLog.request_time.desc())
+                .limit(1)
+                .scalar_subquery()
+            )
+
+            stmt = (
+                select(WeatherLog.notification_time)
+                .where(WeatherLog.id == subquery)
+            )
+
+            result = await session.execute(stmt)
+            return result.scalar_one_or_none()
+
+    async def get_alert_rules(self):
+        async with self.async_session() as session:
+            stmt = select(AlertRule.user_id, AlertRule.location, AlertRule.kind, AlertRule.threshold)
+            result = await session.execute(stmt)
+            return result.fetchall()
+
+    async def set_alert_rules(self, user_id: int, location: str, thresholds: dict):
+        async with self.async_session() as session:
+            async with session.begin():
+                # One rule per kind: replace whatever the user had before
+                await session.execute(
+                    delete(AlertRule)
+                    .where(AlertRule.user_id == user_id, AlertRule.kind.in_(list(thresholds)))
+                )
+                session.add_all([
+                    AlertRule(user_id=user_id, location=location, kind=kind, threshold=threshold)
+                    for kind, threshold in thresholds.items()
+                ])
+
+    async def delete_alert_rules(self, user_id: int):
+        async with self.async_session() as session:
+            async with session.begin():
+                await session.execute(delete(AlertRule).where(AlertRule.user_id == user_id))
@@ -0,0 +1,132 @@
+import sys
+from array import array
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    import json
+
+    loads = json.loads
+else:
+    loads = orjson.loads
+
+
+@dataclass(slots=True)
+class CurrentWeather:
+    temp_c: float
+    feelslike_c: float
+    condition_text: str
+    condition_code: int
+    humidity: int
+    wind_kph: float
+    pressure_mb: float
+    cloud: int
+
+
+@dataclass(slots=True)
+class DailyForecast:
+    date: date
+    maxtemp_c: float
+    mintemp_c: float
+    daily_chance_of_rain: int
+    condition_text: str
+    condition_code: int
+    sunrise: Optional[str]
+    sunset: Optional[str]
+
+
+class HourlySeries:
+    """Hourly values for every forecast day, one typed array per field."""
+
+    __slots__ = (
+        'time_epoch', 'temp_c', 'feelslike_c', 'condition_code', 'condition_text',
+        'humidity', 'wind_kph', 'pressure_mb', 'cloud', 'chance_of_rain', 'precip_mm',
+    )
+
+    def __init__(self):
+        self.time_epoch = array('q')
+        self.temp_c = array('d')
+        self.feelslike_c = array('d')
+        self.condition_code = array('H')
+        self.condition_text = []
+        self.humidity = array('B')
+        self.wind_kph = array('d')
+        self.pressure_mb = array('d')
+        self.cloud = array('B')
+        self.chance_of_rain = array('B')
+        self.precip_mm = array('d')
+
+    def __len__(self):
+        return len(self.time_epoch)
+
+    def append(self, hour: dict):
+        self.time_epoch.append(hour['time_epoch'])
+        self.temp_c.append(hour['temp_c'])
+        self.feelslike_c.append(hour['feelslike_c'])
+        self.condition_code.append(hour['condition']['code'])
+        # Condition texts repeat across hours and districts; share one string per text
+        self.condition_text.append(sys.intern(hour['condition']['text']))
+        self.humidity.append(hour['humidity'])
+        self.wind_kph.append(hour['wind_kph'])
+        self.pressure_mb.append(hour['pressure_mb'])
+        self.cloud.append(hour['cloud'])
+        self.chance_of_rain.append(hour.get('chance_of_rain', 0))
+        self.precip_mm.append(hour.get('precip_mm', 0.0))
+
+
+@dataclass(slots=True)
+class Forecast:
+    location: str
+    current: CurrentWeather
+    days: Tuple[DailyForecast, ...]
+    hourly: HourlySeries
+    # When the data was fetched upstream; cached forecasts show this, not the reply time
+    fetched_at: datetime
+
+
+def parse_current(current: dict) -> CurrentWeather:
+    return CurrentWeather(
+        temp_c=current['temp_c'],
+        feelslike_c=current['feelslike_c'],
+        condition_text=sys.intern(current['condition']['text']),
+        condition_code=current['condition']['code'],
+        humidity=current['humidity'],
+        wind_kph=current['wind_kph'],
+        pressure_mb=current['pressure_mb'],
+        cloud=current['cloud'],
+    )
+
+
+def parse_day(forecastday: dict) -> DailyForecast:
+    day = forecastday['day']
+    astro = forecastday.get('astro') or {}
+    return DailyForecast(
+        date=date.fromisoformat(forecastday['date']),
+        maxtemp_c=day['maxtemp_c'],
+        mintemp_c=day['mintemp_c'],
+        daily_chance_of_rain=day['daily_chance_of_rain'],
+        condition_text=sys.intern(day['condition']['text']),
+        condition_code=day['condition']['code'],
+        sunrise=astro.get('sunrise'),
+        sunset=astro.get('sunset'),
+    )
+
+
+def parse_forecast(location: str, data: dict, fetched_at: Optional[datetime] = None) -> Forecast:
+    """Keep only the fields the renderers use from a weatherapi forecast.json response."""
+    hourly = HourlySeries()
+    days = []
+    for forecastday in data['forecast']['forecastday']:
+        days.append(parse_day(forecastday))
+        for hour in forecastday['hour']:
+            hourly.append(hour)
+    return Forecast(
+        location=location,
+        current=parse_current(data['current']),
+        days=tuple(days),
+        hourly=hourly,
+        fetched_at=fetched_at or datetime.now(),
+    )
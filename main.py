@@ -1,170 +1,169 @@
+from __future__ import annotations
+
 import os
 import asyncio
 import logging
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional
-import aiohttp
-from aiogram import Bot, Dispatcher, types, F
-from aiogram.filters.command import Command
-from aiogram.enums import ChatAction, ParseMode
-from aiogram.types import ReplyKeyboardMarkup, KeyboardButton, InlineKeyboardMarkup, InlineKeyboardButton
-from aiogram.utils.keyboard import ReplyKeyboardBuilder
-from aiogram.client.default import DefaultBotProperties
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Boolean, select, update
-from sqlalchemy.orm import declarative_base
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from functools import cached_property
+from typing import Optional, TYPE_CHECKING
 
 from get_emoji import get_weather_emoji
 from regions import UZBEKISTAN_REGIONS
-import pytz
-from dotenv import load_dotenv
 
-load_dotenv()
+# aiogram, SQLAlchemy, APScheduler and pytz are imported lazily: importing this module
+# must stay cheap so restarts, tests and worker forks don't pay for the whole stack.
+if TYPE_CHECKING:
+    from aiogram import Bot, Dispatcher, types
+    from aiogram.filters.command import CommandObject
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+    from sqlalchemy.ext.asyncio import AsyncEngine
+    from alerts import AlertEngine
+    from database import DatabaseManager
+    from forecast import Forecast
+    from search import DistrictIndex
 
-BOT_TOKEN = os.getenv('BOT_TOKEN')
-WEATHER_API_KEY = os.getenv('WEATHER_API_KEY')
-DATABASE_URL = os.getenv('DATABASE_URL')
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
-Base = declarative_base()
-engine = create_async_engine(DATABASE_URL, echo=True)
-async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-bot = Bot(token=BOT_TOKEN, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
-dp = Dispatcher()
 
 
-class UserState:
-    def __init__(self):
-        self.locations = {}
+@dataclass
+class Config:
+    bot_token: str
+    database_url: str
+    weather_api_key: Optional[str] = None
+    weather_api_url: str = 'https://api.weatherapi.com/v1'
+    database_echo: bool = True
+    weather_cache_ttl: int = 600
+
+    @classmethod
+    def from_env(cls) -> Config:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        missing = [name for name in ('BOT_TOKEN', 'DATABASE_URL') if not os.getenv(name)]
+        if missing:
+            raise RuntimeError(f"Missing environment variables: {', '.join(missing)}")
+        return cls(
+            bot_token=os.getenv('BOT_TOKEN'),
+            database_url=os.getenv('DATABASE_URL'),
+            weather_api_key=os.getenv('WEATHER_API_KEY'),
+            weather_api_url=os.getenv('WEATHER_API_URL', cls.weather_api_url),
+            database_echo=os.getenv('DATABASE_ECHO', '1') not in ('0', 'false', 'False'),
+            weather_cache_ttl=int(os.getenv('WEATHER_CACHE_TTL', cls.weather_cache_ttl)),
+        )
 
 
-user_state = UserState()
+class Application:
+    """Bot components built on first use from a :class:`Config`."""
 
+    def __init__(self, config: Config):
+        self.config = config
 
-# Update the WeatherLog model to include notification settings
-class WeatherLog(Base):
-    __tablename__ = 'weather_logs'
-
-    id = Column(Integer, primary_key=True)
-    user_id = Column(Integer, nullable=False)
-    location = Column(String, nullable=False)
-    temperature = Column(Float, nullable=False)
-    weather_desc = Column(String, nullable=False)
-    request_time = Column(DateTime, default=datetime.utcnow)
-    notifications_enabled = Column(Boolean, default=False)
-    notification_time = Column(Integer)
-
-
-class DatabaseManager:
-    @staticmethod
-    async def init_db():
-        async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
-
-    @staticmethod
-    async def log_weather_request(user_id: int, location: str, temperature: float, weather_desc: str):
-        async with async_session() as session:
-            async with session.begin():
-                log = WeatherLog(
-                    user_id=user_id,
-                    location=location,
-                    temperature=temperature,
-                    weather_desc=weather_desc
-                )
-                session.add(log)
-
-    @staticmethod
-    async def toggle_notifications(user_id: int):
-        async with async_session() as session:
-            async with session.begin():
-                stmt = select(WeatherLog).where(WeatherLog.user_id == user_id).order_by(WeatherLog.request_time.desc())
-                result = await session.execute(stmt)
-                weather_log = result.scalars().first()
-
-                if weather_log:
-                    new_state = not weather_log.notifications_enabled
-                    await session.execute(
-                        update(WeatherLog)
-                        .where(WeatherLog.user_id == user_id)
-                        .values(notifications_enabled=new_state)
-                    )
-                    return new_state
-                return False
-
-    @staticmethod
-    async def get_notification_status(user_id: int):
-        async with async_session() as session:
-            # Get the most recent log entry for the user
-            subquery = (
-                select(WeatherLog.id)
-                .where(WeatherLog.user_id == user_id)
-                .order_by(WeatherLog.request_time.desc())
-                .limit(1)
-                .scalar_subquery()
-            )
+    @cached_property
+    def engine(self) -> AsyncEngine:
+        from sqlalchemy.ext.asyncio import create_async_engine
 
+        return create_async_engine(self.config.database_url, echo=self.config.database_echo)
 
-            stmt = (
-                select(WeatherLog.notifications_enabled)
-                .where(WeatherLog.id == subquery)
-            )
+    @cached_property
+    def db(self) -> DatabaseManager:
+        from database import DatabaseManager
 
-            result = await session.execute(stmt)
-            status = result.scalar_one_or_none()
-            return status if status is not None else False
-
-    @staticmethod
-    async def get_users_for_notifications():
-        async with async_session() as session:
-            stmt = (
-                select(WeatherLog.user_id, WeatherLog.location)
-                .where(WeatherLog.notifications_enabled == True)
-                .group_by(WeatherLog.user_id, WeatherLog.location)
-                .order_by(WeatherLog.request_time.desc())
-            )
-            result = await session.execute(stmt)
-            return result.fetchall()
-
-    @staticmethod
-    async def set_notification_time(user_id: int, hour: int):
-        async with async_session() as session:
-            async with session.begin():
-                stmt = select(WeatherLog).where(WeatherLog.user_id == user_id).order_by(WeatherLog.request_time.desc())
-                result = await session.execute(stmt)
-                weather_log = result.scalars().first()
-
-                if weather_log:
-                    await session.execute(
-                        update(WeatherLog)
-                        .where(WeatherLog.user_id == user_id)
-                        .values(notifications_enabled=True, notification_time=hour)
-                    )
-                    return True
-                return False
-
-    @staticmethod
-    async def get_notification_time(user_id: int):
-        async with async_session() as session:
-            subquery = (
-                select(WeatherLog.id)
-                .where(WeatherLog.user_id == user_id)
-                .order_by(WeatherLog.request_time.desc())
-                .limit(1)
-                .scalar_subquery()
-            )
+        return DatabaseManager(self.engine)
 
-            stmt = (
-                select(WeatherLog.notification_time)
-                .where(WeatherLog.id == subquery)
-            )
+    @cached_property
+    def alerts(self) -> AlertEngine:
+        from alerts import AlertEngine
+
+        return AlertEngine()
+
+    @cached_property
+    def districts(self) -> DistrictIndex:
+        from search import DistrictIndex
+
+        return DistrictIndex(UZBEKISTAN_REGIONS)
+
+    @cached_property
+    def weather(self) -> WeatherService:
+        service = WeatherService(
+            self.config.weather_api_key, self.config.weather_api_url, self.config.weather_cache_ttl
+        )
+        service.listeners.append(self.alerts.on_forecast)
+        return service
+
+    @cached_property
+    def bot(self) -> Bot:
+        from aiogram import Bot
+        from aiogram.client.default import DefaultBotProperties
+        from aiogram.enums import ParseMode
+
+        return Bot(token=self.config.bot_token, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
+
+    @cached_property
+    def dp(self) -> Dispatcher:
+        from aiogram import Dispatcher
+
+        dp = Dispatcher(db=self.db, weather=self.weather, alerts=self.alerts, districts=self.districts)
+        register_handlers(dp)
+        return dp
+
+    @cached_property
+    def scheduler(self) -> AsyncIOScheduler:
+        from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+        scheduler = AsyncIOScheduler(timezone="Asia/Tashkent")
+        scheduler.add_job(
+            send_daily_notifications, 'cron', minute=0,  # Run every hour at :00
+            kwargs={'db': self.db, 'weather': self.weather}
+        )
+        scheduler.add_job(
+            refresh_alert_districts, 'interval', minutes=30,
+            kwargs={'weather': self.weather, 'alerts': self.alerts}
+        )
+        return scheduler
+
+    async def run(self):
+        logger.info("Bot ishga tushirilmoqda...")
+        try:
+            await self.db.init_db()
+            self.alerts.load(await self.db.get_alert_rules())
+            delivery = asyncio.create_task(deliver_alerts(self.alerts, self.bot))
+            self.scheduler.start()
+            logger.info("Bot va scheduler ishga tushdi...")
+            await self.dp.start_polling(self.bot)
+            delivery.cancel()
+        except Exception as e:
+            logger.error(f"Xatolik yuz berdi: {e}")
+        finally:
+            await self.bot.session.close()
+
+
+def create_app(config: Optional[Config] = None) -> Application:
+    return Application(config or Config.from_env())
 
-            result = await session.execute(stmt)
-            return result.scalar_one_or_none()
+
+def tashkent_now() -> datetime:
+    import pytz
+
+    return datetime.now(pytz.timezone('Asia/Tashkent'))
+
+
+class UserState:
+    def __init__(self):
+        self.locations = {}
+
+
+user_state = UserState()
+
+
+def is_known_district(district: str) -> bool:
+    return any(district in districts for districts in UZBEKISTAN_REGIONS.values())
 
 
 def get_time_selection_keyboard():
+    from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+
     keyboard = InlineKeyboardMarkup(inline_keyboard=[
         [
             InlineKeyboardButton(text=f"{i:02d}:00", callback_data=f"notif_time:{i}")
@@ -179,22 +178,86 @@ def get_time_selection_keyboard():
 
 
 class WeatherService:
-    @staticmethod
-    async def fetch_weather(location: str, forecast_type: str = 'current') -> Optional[dict]:
-        base_url = "https://api.weatherapi.com/v1"
+    def __init__(self, api_key: Optional[str], base_url: str = 'https://api.weatherapi.com/v1', cache_ttl: int = 600):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.cache_ttl = cache_ttl
+        # location -> (expires_at, Forecast); one parsed weekly forecast per district
+        self._cache = {}
+        self._pending = {}
+        # Called as listener(location, forecast) after every upstream refresh
+        self.listeners = []
+
+    async def get_forecast(self, location: str) -> Optional[Forecast]:
+        forecast = self.cached(location)
+        if forecast:
+            return forecast
+        return await asyncio.shield(self._start_refresh(location))
+
+    def cached(self, location: str) -> Optional[Forecast]:
+        """Return the cached forecast if it is still fresh, without touching upstream."""
+        cached = self._cache.get(location)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        return None
+
+    def warm(self, location: str):
+        """Start a background refresh for ``location`` unless it is cached or already loading."""
+        if self.cached(location) is None:
+            self._start_refresh(location)
+
+    async def drain(self):
+        """Wait for refreshes that are still in flight, e.g. ones started by ``warm``."""
+        await asyncio.gather(*self._pending.values(), return_exceptions=True)
+
+    def _start_refresh(self, location: str) -> asyncio.Future:
+        # Concurrent misses for the same district share a single upstream request
+        pending = self._pending.get(location)
+        if pending is None:
+            pending = asyncio.ensure_future(self._refresh(location))
+            self._pending[location] = pending
+            pending.add_done_callback(lambda _: self._pending.pop(location, None))
+        return pending
+
+    async def _refresh(self, location: str) -> Optional[Forecast]:
+        from forecast import parse_forecast
+
+        weather_data = await self.fetch_weather(location, 'weekly')
+        if not weather_data:
+            return None
+        try:
+            forecast = parse_forecast(location, weather_data, fetched_at=tashkent_now())
+        except (KeyError, TypeError, ValueError) as e:
+            logger.error(f"Error parsing forecast for {location}: {e}")
+            return None
+        now = time.monotonic()
+        # Drop expired entries so the cache only holds what is still servable
+        for stale in [key for key, (expires, _) in self._cache.items() if expires <= now]:
+            del self._cache[stale]
+        self._cache[location] = (now + self.cache_ttl, forecast)
+        for listener in self.listeners:
+            try:
+                listener(location, forecast)
+            except Exception as e:
+                logger.error(f"Error in forecast listener for {location}: {e}")
+        return forecast
+
+    async def fetch_weather(self, location: str, forecast_type: str = 'current') -> Optional[dict]:
+        import aiohttp
+        from forecast import loads
 
         if forecast_type in ['hourly', 'weekly']:
-            endpoint = f"{base_url}/forecast.json"
+            endpoint = f"{self.base_url}/forecast.json"
             params = {
-                'key': WEATHER_API_KEY,
+                'key': self.api_key,
                 'q': location,
                 'days': 7 if forecast_type == 'weekly' else 2,
                 'aqi': 'no'
             }
         else:
-            endpoint = f"{base_url}/current.json"
+            endpoint = f"{self.base_url}/current.json"
             params = {
-                'key': WEATHER_API_KEY,
+                'key': self.api_key,
                 'q': location,
                 'aqi': 'no'
             }
@@ -203,7 +266,7 @@ class WeatherService:
             async with aiohttp.ClientSession() as session:
                 async with session.get(endpoint, params=params) as resp:
                     if resp.status == 200:
-                        return await resp.json()
+                        return loads(await resp.read())
                     logger.error(f"API Error: {resp.status} - {await resp.text()}")
                     return None
         except Exception as e:
@@ -212,6 +275,9 @@ class WeatherService:
 
 
 def get_regions_keyboard():
+    from aiogram.types import KeyboardButton
+    from aiogram.utils.keyboard import ReplyKeyboardBuilder
+
     builder = ReplyKeyboardBuilder()
     for region in UZBEKISTAN_REGIONS.keys():
         builder.add(KeyboardButton(text=f"🏠 {region}"))
@@ -220,6 +286,9 @@ def get_regions_keyboard():
 
 
 def get_districts_keyboard(region: str):
+    from aiogram.types import KeyboardButton
+    from aiogram.utils.keyboard import ReplyKeyboardBuilder
+
     builder = ReplyKeyboardBuilder()
     districts = UZBEKISTAN_REGIONS.get(region.replace("🏠 ", ""), [])
     for district in districts:
@@ -231,6 +300,9 @@ def get_districts_keyboard(region: str):
 
 # Update get_main_keyboard function
 def get_main_keyboard(notifications_enabled: bool = False):
+    from aiogram.types import KeyboardButton
+    from aiogram.utils.keyboard import ReplyKeyboardBuilder
+
     builder = ReplyKeyboardBuilder()
     builder.row(
         KeyboardButton(text="🏠 Viloyatlar"),
@@ -241,20 +313,22 @@ def get_main_keyboard(notifications_enabled: bool = False):
         KeyboardButton(text=f"🔔 Bildirishnomalar {'✅' if notifications_enabled else '❌'}"),
         KeyboardButton(text="📞 Aloqa")
     )
-    builder.row(KeyboardButton(text="ℹ️ Yordam"))
+    builder.row(
+        KeyboardButton(text="⚠️ Ogohlantirishlar"),
+        KeyboardButton(text="ℹ️ Yordam")
+    )
     return builder.as_markup(resize_keyboard=True)
 
 
 # Add notification toggle handler
 
-@dp.message(F.text.startswith("🔔 Bildirishnomalar"))
-async def toggle_notifications(message: types.Message):
+async def toggle_notifications(message: types.Message, db: DatabaseManager):
     user_id = message.from_user.id
-    current_status = await DatabaseManager.get_notification_status(user_id)
+    current_status = await db.get_notification_status(user_id)
 
     if current_status:
         # Turn off notifications
-        await DatabaseManager.toggle_notifications(user_id)
+        await db.toggle_notifications(user_id)
         await message.answer(
             "Kunlik ob-havo bildirishnomalari o'chirildi ❌",
             reply_markup=get_main_keyboard(False)
@@ -267,8 +341,7 @@ async def toggle_notifications(message: types.Message):
         )
 
 
-@dp.callback_query(F.data.startswith("notif_time:"))
-async def handle_notification_time(callback: types.CallbackQuery):
+async def handle_notification_time(callback: types.CallbackQuery, db: DatabaseManager):
     hour = callback.data.split(":")[1]
 
     if hour == "cancel":
@@ -281,7 +354,7 @@ async def handle_notification_time(callback: types.CallbackQuery):
     hour = int(hour)
     user_id = callback.from_user.id
 
-    success = await DatabaseManager.set_notification_time(user_id, hour)
+    success = await db.set_notification_time(user_id, hour)
 
     if success:
         await callback.message.edit_text(
@@ -299,38 +372,108 @@ async def handle_notification_time(callback: types.CallbackQuery):
 
 
 # Update the send_daily_notifications function
-async def send_daily_notifications():
-    current_hour = datetime.now(pytz.timezone('Asia/Tashkent')).hour
-    async with async_session() as session:
-        # Get all users who have notifications enabled for the current hour
-        stmt = (
-            select(WeatherLog.user_id, WeatherLog.location)
-            .where(
-                WeatherLog.notifications_enabled == True,
-                WeatherLog.notification_time == current_hour
-            )
-            .group_by(WeatherLog.user_id, WeatherLog.location)
-        )
-        result = await session.execute(stmt)
-        users = result.fetchall()
+async def send_daily_notifications(db: DatabaseManager, weather: WeatherService):
+    from aiogram import types
+
+    current_hour = tashkent_now().hour
+    # Get all users who have notifications enabled for the current hour
+    users = await db.get_users_for_hour(current_hour)
 
     for user_id, location in users:
         try:
             message = types.Message(chat=types.Chat(id=user_id, type='private'))
-            await send_current_weather(message, location)
+            await send_current_weather(message, location, db, weather)
         except Exception as e:
             logger.error(f"Error sending notification to user {user_id}: {e}")
 
 
-def setup_scheduler():
-    scheduler = AsyncIOScheduler(timezone="Asia/Tashkent")
-    scheduler.add_job(send_daily_notifications, 'cron', minute=0)  # Run every hour at :00
-    scheduler.start()
-    return scheduler
+async def refresh_alert_districts(weather: WeatherService, alerts: AlertEngine):
+    # Refreshing a district runs the alert engine for it; only subscribed districts are fetched
+    for location in alerts.locations():
+        await weather.get_forecast(location)
+
+
+async def deliver_alerts(alerts: AlertEngine, bot: Bot):
+    from alerts import format_alert
+
+    while True:
+        alert = await alerts.queue.get()
+        try:
+            await bot.send_message(alert.user_id, format_alert(alert, alerts.horizon))
+        except Exception as e:
+            logger.error(f"Error sending alert to user {alert.user_id}: {e}")
+
+
+# Uzbek rule names accepted by /ogohlantirish -> alert kinds
+ALERT_KINDS = {'yomgir': 'rain', 'sovuq': 'frost', 'harorat': 'swing'}
+
+
+async def toggle_alerts(message: types.Message, db: DatabaseManager, alerts: AlertEngine):
+    from alerts import RULES
+
+    user_id = message.from_user.id
+
+    if alerts.rules_for(user_id):
+        await db.delete_alert_rules(user_id)
+        alerts.remove_user(user_id)
+        await message.answer("Ob-havo ogohlantirishlari o'chirildi ❌")
+        return
+
+    location = user_state.locations.get(user_id)
+    if not location:
+        await message.answer(
+            "Iltimos, avval viloyat va tumanni tanlang!",
+            reply_markup=get_regions_keyboard()
+        )
+        return
+
+    thresholds = {kind: threshold for kind, (threshold, _) in RULES.items()}
+    await db.set_alert_rules(user_id, location, thresholds)
+    for kind, threshold in thresholds.items():
+        alerts.set_rule(user_id, location, kind, threshold)
+
+    await message.answer(
+        f"<b>{location}</b> uchun ogohlantirishlar yoqildi ✅\n\n"
+        f"🌧 Yog'ingarchilik ehtimoli {thresholds['rain']:.0f}% dan oshsa\n"
+        f"❄️ Harorat {thresholds['frost']:.0f}°C gacha tushsa\n"
+        f"🌡 Harorat {thresholds['swing']:.0f}°C dan ko'proq o'zgarsa"
+    )
+
+
+async def alert_threshold_command(message: types.Message, command: CommandObject, db: DatabaseManager,
+                                  alerts: AlertEngine):
+    from alerts import valid_threshold
+
+    user_id = message.from_user.id
+    args = (command.args or "").split()
+
+    try:
+        kind = ALERT_KINDS[args[0].lower()]
+        threshold = float(args[1].replace(",", "."))
+        if not valid_threshold(kind, threshold):
+            raise ValueError(threshold)
+    except (IndexError, KeyError, ValueError):
+        await message.answer(
+            "Foydalanish: <code>/ogohlantirish yomgir 60</code>\n"
+            "Turlari: yomgir (%), sovuq (°C), harorat (°C)"
+        )
+        return
+
+    rule = alerts.rules_for(user_id).get(kind)
+    location = rule[0] if rule else user_state.locations.get(user_id)
+    if not location:
+        await message.answer(
+            "Iltimos, avval viloyat va tumanni tanlang!",
+            reply_markup=get_regions_keyboard()
+        )
+        return
+
+    await db.set_alert_rules(user_id, location, {kind: threshold})
+    alerts.set_rule(user_id, location, kind, threshold)
+    await message.answer(f"<b>{location}</b>: ogohlantirish chegarasi {args[0]} = {threshold:g} ✅")
 
 
-@dp.message(F.text == "🌤 Ob-havo tekshirish")
-async def weather_command(message: types.Message):
+async def weather_command(message: types.Message, db: DatabaseManager, weather: WeatherService):
     user_id = message.from_user.id
     location = user_state.locations.get(user_id)
 
@@ -341,10 +484,9 @@ async def weather_command(message: types.Message):
         )
         return
 
-    await send_current_weather(message, location)
+    await send_current_weather(message, location, db, weather)
 
 
-@dp.message(F.text == "📅 Vaqt tanlash")
 async def forecast_options_command(message: types.Message):
     user_id = message.from_user.id
     location = user_state.locations.get(user_id)
@@ -362,16 +504,19 @@ async def forecast_options_command(message: types.Message):
     )
 
 
-@dp.callback_query(F.data.startswith("forecast:"))
-async def handle_forecast_callback(callback: types.CallbackQuery):
+async def handle_forecast_callback(callback: types.CallbackQuery, db: DatabaseManager, weather: WeatherService):
     _, forecast_type, location = callback.data.split(":")
+    # callback_data comes from the client; don't fetch or cache forecasts for made-up places
+    if not is_known_district(location):
+        await callback.answer("Bunday tuman topilmadi", show_alert=True)
+        return
 
     if forecast_type == "today":
-        await send_current_weather(callback.message, location)
+        await send_current_weather(callback.message, location, db, weather)
     elif forecast_type == "hourly":
-        await send_hourly_forecast(callback.message, location)
+        await send_hourly_forecast(callback.message, location, weather)
     elif forecast_type == "weekly":
-        await send_weekly_forecast(callback.message, location)
+        await send_weekly_forecast(callback.message, location, weather)
 
     await callback.answer()
 
@@ -380,6 +525,8 @@ async def handle_forecast_callback(callback: types.CallbackQuery):
 
 
 def get_forecast_keyboard(location: str):
+    from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+
     keyboard = InlineKeyboardMarkup(inline_keyboard=[
         [
             InlineKeyboardButton(text="🕒 Hozirgi", callback_data=f"forecast:today:{location}"),
@@ -392,12 +539,10 @@ def get_forecast_keyboard(location: str):
     return keyboard
 
 
-@dp.message(F.text == "🏠 Viloyatlar")
 async def show_regions(message: types.Message):
     await message.answer("Viloyatni tanlang:", reply_markup=get_regions_keyboard())
 
 
-@dp.message(F.text.startswith("🏠 "))
 async def show_districts(message: types.Message):
     region = message.text
     await message.answer(f"{region} tumanlari:", reply_markup=get_districts_keyboard(region))
@@ -405,19 +550,15 @@ async def show_districts(message: types.Message):
 
 # Update handle_district_selection to check notification status
 
-@dp.message(F.text.startswith("🏘 "))
-async def handle_district_selection(message: types.Message):
+async def handle_district_selection(message: types.Message, db: DatabaseManager, weather: WeatherService):
+    from aiogram.enums import ParseMode
+
     district = message.text.replace("🏘 ", "")
     user_id = message.from_user.id
 
-    is_valid_district = any(
-        district in districts
-        for districts in UZBEKISTAN_REGIONS.values()
-    )
-
-    if is_valid_district:
+    if is_known_district(district):
         user_state.locations[user_id] = district
-        notifications_enabled = await DatabaseManager.get_notification_status(user_id)
+        notifications_enabled = await db.get_notification_status(user_id)
 
         await message.answer(
             f"Sizning tanlovingiz: <b>{district}</b>\n\n",
@@ -425,7 +566,7 @@ async def handle_district_selection(message: types.Message):
             reply_markup=get_main_keyboard(notifications_enabled)
         )
 
-        await send_current_weather(message, district)
+        await send_current_weather(message, district, db, weather)
     else:
         await message.answer(
             "Iltimos, ob-havo ma'lumotlarini olish uchun ro'yxatdan tumanlardan birini tanlang.",
@@ -433,18 +574,16 @@ async def handle_district_selection(message: types.Message):
         )
 
 
-@dp.message(F.text == "🔙 Orqaga")
-async def go_back(message: types.Message):
+async def go_back(message: types.Message, db: DatabaseManager):
     user_id = message.from_user.id
-    notifications_enabled = await DatabaseManager.get_notification_status(user_id)
+    notifications_enabled = await db.get_notification_status(user_id)
     await message.answer("Asosiy menyu:", reply_markup=get_main_keyboard(notifications_enabled))
 
 
 # Update handlers to use the new get_main_keyboard function
-@dp.message(Command("start"))
-async def start_command(message: types.Message):
+async def start_command(message: types.Message, db: DatabaseManager):
     user_id = message.from_user.id
-    notifications_enabled = await DatabaseManager.get_notification_status(user_id)
+    notifications_enabled = await db.get_notification_status(user_id)
 
     await message.answer(
         f"Assalomu alaykum, {message.from_user.first_name}! 🌤️\n"
@@ -457,23 +596,27 @@ async def start_command(message: types.Message):
     )
 
 
-@dp.message(F.text == "ℹ️ Yordam")
 async def help_command(message: types.Message):
+    from aiogram.enums import ParseMode
+
     help_text = (
         "Bot dan foydalanish bo'yicha yordam:\n\n"
         "1. 🏠 <b>Viloyatlar</b> - Viloyat va tumanini tanlash\n"
         "2. 🌤 <b>Ob-havo tekshirish</b> - Tanlangan hudud uchun ob-havo ma'lumoti\n"
-        "3. 📅 <b>Vaqt tanlash</b> - Turli vaqt oralig'i uchun ob-havo\n\n"
+        "3. 📅 <b>Vaqt tanlash</b> - Turli vaqt oralig'i uchun ob-havo\n"
+        "4. ⚠️ <b>Ogohlantirishlar</b> - Yomg'ir, sovuq yoki keskin harorat o'zgarishi haqida xabar\n"
+        "   Chegarani o'zgartirish: <code>/ogohlantirish yomgir 60</code> "
+        "(yomgir, sovuq yoki harorat)\n"
+        "5. 🔎 Istalgan chatda bot nomini va tuman nomini yozing, masalan: <code>@bot chil</code>\n\n"
         "<i>Eslatma: Ob-havo ma'lumotlarini olish uchun avval viloyat va "
         "tumanni tanlash kerak!</i>"
     )
     await message.answer(help_text, parse_mode=ParseMode.HTML)
 
 
-@dp.message(F.text == "📞 Aloqa")
-async def contact_handler(message: types.Message):
+async def contact_handler(message: types.Message, db: DatabaseManager):
     user_id = message.from_user.id
-    notifications_enabled = await DatabaseManager.get_notification_status(user_id)
+    notifications_enabled = await db.get_notification_status(user_id)
     await message.answer(
         "😊 Assalomu alaykum! 🤖 Men bilan bog'lanishni xohlaysizmi?\n"
         "👏 Ajoyib! Fikr-mulohazalaringiz, takliflaringiz yoki savollar bilan bemalol murojaat qiling!\n"
@@ -487,8 +630,7 @@ async def contact_handler(message: types.Message):
     )
 
 
-@dp.message(F.text.in_(["🌤 Ob-havo tekshirish", "📅 Vaqt tanlash"]))
-async def weather_command(message: types.Message):
+async def weather_menu_command(message: types.Message, db: DatabaseManager, weather: WeatherService):
     user_id = message.from_user.id
     location = user_state.locations.get(user_id)
 
@@ -500,7 +642,7 @@ async def weather_command(message: types.Message):
         return
 
     if message.text == "🌤 Ob-havo tekshirish":
-        await send_current_weather(message, location)
+        await send_current_weather(message, location, db, weather)
     else:
         await message.answer(
             f"{location} uchun qaysi vaqt oralig'idagi ob-havo ma'lumotini ko'rmoqchisiz?",
@@ -508,10 +650,9 @@ async def weather_command(message: types.Message):
         )
 
 
-@dp.message(F.text)
-async def handle_text(message: types.Message):
+async def handle_text(message: types.Message, db: DatabaseManager):
     user_id = message.from_user.id
-    notifications_enabled = await DatabaseManager.get_notification_status(user_id)
+    notifications_enabled = await db.get_notification_status(user_id)
     if message.text not in ["🌤 Ob-havo tekshirish", "📅 Vaqt tanlash", "ℹ️ Yordam", "🏠 Viloyatlar", "🔙 Orqaga"]:
         await message.answer(
             "Iltimos, ob-havo ma'lumotlarini olish uchun quyidagi tugmalardan foydalaning:",
@@ -519,80 +660,139 @@ async def handle_text(message: types.Message):
         )
 
 
-@dp.callback_query(F.data.startswith("update_weather:"))
-async def update_weather_callback(callback_query: types.CallbackQuery):
+async def update_weather_callback(callback_query: types.CallbackQuery, db: DatabaseManager, weather: WeatherService):
     _, action, location = callback_query.data.split(":")
+    if not is_known_district(location):
+        await callback_query.answer("Bunday tuman topilmadi", show_alert=True)
+        return
 
     if action == "current":
-        await send_current_weather(callback_query.message, location)
+        await send_current_weather(callback_query.message, location, db, weather)
     elif action == "hourly":
-        await send_hourly_forecast(callback_query.message, location)
+        await send_hourly_forecast(callback_query.message, location, weather)
     elif action == "weekly":
-        await send_weekly_forecast(callback_query.message, location)
+        await send_weekly_forecast(callback_query.message, location, weather)
 
     await callback_query.answer()
 
 
+INLINE_RESULTS_LIMIT = 10
+INLINE_WARM_LIMIT = 3
+INLINE_CACHE_TIME = 300
+# Answers missing uncached districts are re-asked soon, once the background refresh has landed
+INLINE_PARTIAL_CACHE_TIME = 5
+
+
+async def inline_weather(inline_query: types.InlineQuery, weather: WeatherService, districts: DistrictIndex):
+    from aiogram.enums import ParseMode
+    from aiogram.types import InlineQueryResultArticle, InlineQueryResultsButton, InputTextMessageContent
+
+    # Inline queries fire on every keystroke: answer from the cache only and never wait on upstream
+    results = []
+    misses = 0
+    for district, region in districts.search(inline_query.query, limit=INLINE_RESULTS_LIMIT):
+        forecast = weather.cached(district)
+        if not forecast:
+            if misses < INLINE_WARM_LIMIT:
+                weather.warm(district)
+            misses += 1
+            continue
+        current = forecast.current
+        results.append(InlineQueryResultArticle(
+            id=f"{region}:{district}",
+            title=f"{district} — {current.temp_c}°C",
+            description=f"{get_weather_emoji(current.condition_text)} {current.condition_text} · {region}",
+            input_message_content=InputTextMessageContent(
+                message_text=format_current_weather(district, forecast),
+                parse_mode=ParseMode.HTML
+            )
+        ))
+
+    # Answers are the same for everyone, so let Telegram serve repeats for as long as our cache would
+    cache_time = INLINE_PARTIAL_CACHE_TIME if misses else min(INLINE_CACHE_TIME, weather.cache_ttl)
+    # Nothing to show (empty query or no cached match yet): offer to open the bot instead
+    button = None if results else InlineQueryResultsButton(text="🔎 Tuman nomini yozing", start_parameter="inline")
+    await inline_query.answer(results, cache_time=cache_time, is_personal=False, button=button)
+
+
+def register_handlers(dp: Dispatcher):
+    # Registration order is dispatch order: keep the catch-all F.text handler last.
+    from aiogram import F
+    from aiogram.filters.command import Command
+
+    dp.message.register(toggle_notifications, F.text.startswith("🔔 Bildirishnomalar"))
+    dp.callback_query.register(handle_notification_time, F.data.startswith("notif_time:"))
+    dp.message.register(weather_command, F.text == "🌤 Ob-havo tekshirish")
+    dp.message.register(forecast_options_command, F.text == "📅 Vaqt tanlash")
+    dp.callback_query.register(handle_forecast_callback, F.data.startswith("forecast:"))
+    dp.message.register(show_regions, F.text == "🏠 Viloyatlar")
+    dp.message.register(show_districts, F.text.startswith("🏠 "))
+    dp.message.register(handle_district_selection, F.text.startswith("🏘 "))
+    dp.message.register(go_back, F.text == "🔙 Orqaga")
+    dp.message.register(start_command, Command("start"))
+    dp.message.register(help_command, F.text == "ℹ️ Yordam")
+    dp.message.register(contact_handler, F.text == "📞 Aloqa")
+    dp.message.register(toggle_alerts, F.text == "⚠️ Ogohlantirishlar")
+    dp.message.register(alert_threshold_command, Command("ogohlantirish"))
+    dp.message.register(weather_menu_command, F.text.in_(["🌤 Ob-havo tekshirish", "📅 Vaqt tanlash"]))
+    dp.message.register(handle_text, F.text)
+    dp.callback_query.register(update_weather_callback, F.data.startswith("update_weather:"))
+    dp.inline_query.register(inline_weather)
+
+
 async def main():
-    logger.info("Bot ishga tushirilmoqda...")
-    try:
-        await DatabaseManager.init_db()
-        scheduler = setup_scheduler()
-        logger.info("Bot va scheduler ishga tushdi...")
-        await dp.start_polling(bot)
-    except Exception as e:
-        logger.error(f"Xatolik yuz berdi: {e}")
-    finally:
-        await bot.session.close()
+    logging.basicConfig(level=logging.INFO)
+    await create_app().run()
+
+
+def format_current_weather(location: str, forecast: Forecast) -> str:
+    current = forecast.current
+    today = forecast.days[0] if forecast.days else None
+    uz_time = tashkent_now()
+
+    response = [
+        f"📅 Bugun, {uz_time.strftime('%A')}, {uz_time.strftime('%d-%B')}",
+        f"📍 {location}\n",
+        f"🌡 Hozirgi ob-havo:",
+        f"{get_weather_emoji(current.condition_text)} {current.condition_text}",
+        f"Harorat: {current.temp_c}°C",
+        f"His etilishi: {current.feelslike_c}°C",
+        "———",
+        f"Bulutlilik: {current.cloud}%",
+        f"Namlik: {current.humidity}%",
+        f"Shamol: {current.wind_kph} km/soat",
+        f"Bosim: {current.pressure_mb} mbar"
+    ]
+
+    if today and today.sunrise:
+        response.extend([
+            f"Quyosh chiqishi: {today.sunrise}",
+            f"Quyosh botishi: {today.sunset}"
+        ])
 
+    response.extend([
+        f"\n♻️ So'nggi yangilanish: {forecast.fetched_at.strftime('%H:%M')}"
+    ])
+
+    return "\n".join(response)
+
+
+async def send_current_weather(message: types.Message, location: str, db: DatabaseManager, weather: WeatherService):
+    from aiogram.enums import ParseMode
+    from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
-async def send_current_weather(message: types.Message, location: str):
     try:
-        weather_data = await WeatherService.fetch_weather(location)
-        if weather_data and 'current' in weather_data:
-            current = weather_data['current']
+        forecast = await weather.get_forecast(location)
+        if forecast:
+            current = forecast.current
             # Log the weather request
-            await DatabaseManager.log_weather_request(
+            await db.log_weather_request(
                 user_id=message.from_user.id,
                 location=location,
-                temperature=current['temp_c'],
-                weather_desc=current['condition']['text']
+                temperature=current.temp_c,
+                weather_desc=current.condition_text
             )
 
-            # Get forecast data separately to handle potential missing data
-            forecast_data = await WeatherService.fetch_weather(location, 'weekly')
-            astro = None
-            if forecast_data and 'forecast' in forecast_data:
-                try:
-                    astro = forecast_data['forecast']['forecastday'][0]['astro']
-                except (KeyError, IndexError):
-                    astro = None
-            uz_time = datetime.now(pytz.timezone('Asia/Tashkent'))
-
-            response = [
-                f"📅 Bugun, {uz_time.strftime('%A')}, {uz_time.strftime('%d-%B')}",
-                f"📍 {location}\n",
-                f"🌡 Hozirgi ob-havo:",
-                f"{get_weather_emoji(current['condition']['text'])} {current['condition']['text']}",
-                f"Harorat: {current['temp_c']}°C",
-                f"His etilishi: {current['feelslike_c']}°C",
-                "———",
-                f"Bulutlilik: {current['cloud']}%",
-                f"Namlik: {current['humidity']}%",
-                f"Shamol: {current['wind_kph']} km/soat",
-                f"Bosim: {current['pressure_mb']} mbar"
-            ]
-
-            if astro:
-                response.extend([
-                    f"Quyosh chiqishi: {astro['sunrise']}",
-                    f"Quyosh botishi: {astro['sunset']}"
-                ])
-
-            response.extend([
-                f"\n♻️ So'nggi yangilanish: {uz_time.strftime('%H:%M')}"
-            ])
-
             keyboard = InlineKeyboardMarkup(inline_keyboard=[
                 [
                     InlineKeyboardButton(text="🔄 Yangilash", callback_data=f"update_weather:current:{location}"),
@@ -601,7 +801,8 @@ async def send_current_weather(message: types.Message, location: str):
                 ]
             ])
 
-            await message.answer("\n".join(response), reply_markup=keyboard, parse_mode=ParseMode.HTML)
+            await message.answer(format_current_weather(location, forecast), reply_markup=keyboard,
+                                 parse_mode=ParseMode.HTML)
         else:
             await message.answer(
                 f"Kechirasiz, {location} uchun ma'lumot topilmadi. Shahar nomini tekshirib, qayta urinib ko'ring.")
@@ -611,27 +812,25 @@ async def send_current_weather(message: types.Message, location: str):
             f"Kechirasiz, ob-havo ma'lumotlarini olishda xatolik yuz berdi. Iltimos, keyinroq qayta urinib ko'ring.")
 
 
-async def send_weekly_forecast(message: types.Message, location: str):
-    weather_data = await WeatherService.fetch_weather(location, 'weekly')
-    if weather_data:
-        forecast_days = weather_data['forecast']['forecastday']
+async def send_weekly_forecast(message: types.Message, location: str, weather: WeatherService):
+    from aiogram.enums import ParseMode
+    from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
+    forecast = await weather.get_forecast(location)
+    if forecast:
         response = [f"📅 Haftalik ob-havo\n📍 {location}\n"]
 
-        for day in forecast_days:
-            date = datetime.fromisoformat(day['date'])
-            day_name = date.strftime('%A')
-            day_data = day['day']
+        for day in forecast.days:
+            day_name = day.date.strftime('%A')
 
             response.append(
-                f"\n{day_name}, {date.strftime('%d-%B')}\n"
-                f"{get_weather_emoji(day_data['condition']['text'])} "
-                f"+{day_data['maxtemp_c']}° ... +{day_data['mintemp_c']}°  {day_data['condition']['text']}\n"
-                f"Yog'ingarchilik ehtimoli: {day_data['daily_chance_of_rain']}%"
+                f"\n{day_name}, {day.date.strftime('%d-%B')}\n"
+                f"{get_weather_emoji(day.condition_text)} "
+                f"+{day.maxtemp_c}° ... +{day.mintemp_c}°  {day.condition_text}\n"
+                f"Yog'ingarchilik ehtimoli: {day.daily_chance_of_rain}%"
             )
-        uz_time = datetime.now(pytz.timezone('Asia/Tashkent'))
         response.extend([
-            f"\n♻️ So'nggi yangilanish: {uz_time.strftime('%H:%M')}"
+            f"\n♻️ So'nggi yangilanish: {forecast.fetched_at.strftime('%H:%M')}"
         ])
 
         keyboard = InlineKeyboardMarkup(inline_keyboard=[
@@ -645,29 +844,32 @@ async def send_weekly_forecast(message: types.Message, location: str):
             f"Kechirasiz, {location} uchun ma'lumot topilmadi. Shahar nomini tekshirib, qayta urinib ko'ring.")
 
 
-async def send_hourly_forecast(message: types.Message, location: str):
-    weather_data = await WeatherService.fetch_weather(location, 'hourly')
-    if weather_data:
-        hourly_forecast = weather_data['forecast']['forecastday'][0]['hour']  # Faqat birinchi 24 soat
+async def send_hourly_forecast(message: types.Message, location: str, weather: WeatherService):
+    from aiogram.enums import ParseMode
+    from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+
+    forecast = await weather.get_forecast(location)
+    if forecast:
+        hourly = forecast.hourly
 
-        uz_time = datetime.now(pytz.timezone('Asia/Tashkent'))
+        uz_time = tashkent_now()
         start_hour = uz_time.replace(minute=0, second=0, microsecond=0)
 
         response = [f"🕒 24 soatlik ob-havo\n📍 {location}\n"]  # Sarlavhani o'zgartiring
 
-        for i, hour in enumerate(hourly_forecast[:24]):  # Faqat dastlabki 24 soat
+        for i in range(min(len(hourly), 24)):  # Faqat dastlabki 24 soat
             forecast_time = start_hour + timedelta(hours=i)
             if i == 0:
                 response.append("\n🔹 Hozirdan boshlab 24 soat")
 
             response.append(
                 f"{forecast_time.strftime('%H:%M')} — "
-                f"{get_weather_emoji(hour['condition']['text'])} {hour['temp_c']}°, "
-                f"{hour['condition']['text']}"
+                f"{get_weather_emoji(hourly.condition_text[i])} {hourly.temp_c[i]}°, "
+                f"{hourly.condition_text[i]}"
             )
 
         response.extend([
-            f"\n♻️ So'nggi yangilanish: {uz_time.strftime('%H:%M')}"
+            f"\n♻️ So'nggi yangilanish: {forecast.fetched_at.strftime('%H:%M')}"
         ])
 
         keyboard = InlineKeyboardMarkup(inline_keyboard=[
@@ -0,0 +1,83 @@
+import re
+from bisect import bisect_left
+from typing import Dict, List, Set, Tuple
+
+# Uzbek Latin writes o‘/g‘ and the tutuq belgisi with several look-alike characters;
+# users type any of them or none at all, so "Qo'qon", "Qo‘qon" and "qoqon" must match.
+_APOSTROPHES = re.compile(r"['`ʻʼ‘’´]")
+_SPACES = re.compile(r"\s+")
+
+# Ranks, best first
+EXACT_PREFIX, WORD_PREFIX, REGION_PREFIX, SUBSTRING = range(4)
+
+
+def normalize(text: str) -> str:
+    return _SPACES.sub(" ", _APOSTROPHES.sub("", text.casefold())).strip()
+
+
+def trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class DistrictIndex:
+    """Prefix and trigram index over the districts of ``UZBEKISTAN_REGIONS``.
+
+    Every word boundary of a district name (and of its region name) is a key in one
+    sorted list, so a prefix lookup is a bisect plus a scan over the matches. Queries
+    that don't start a word fall back to trigram posting lists.
+    """
+
+    def __init__(self, regions: Dict[str, List[str]]):
+        self.entries: List[Tuple[str, str]] = []
+        self._names: List[str] = []
+        keys = []
+        for region, districts in regions.items():
+            region_name = normalize(region)
+            for district in districts:
+                entry_id = len(self.entries)
+                name = normalize(district)
+                self.entries.append((district, region))
+                self._names.append(name)
+                for start in self._word_starts(name):
+                    keys.append((name[start:], EXACT_PREFIX if start == 0 else WORD_PREFIX, entry_id))
+                for start in self._word_starts(region_name):
+                    keys.append((region_name[start:], REGION_PREFIX, entry_id))
+        keys.sort()
+        self._keys = [key for key, _, _ in keys]
+        self._refs = [(rank, entry_id) for _, rank, entry_id in keys]
+
+        self._trigrams: Dict[str, Set[int]] = {}
+        for entry_id, name in enumerate(self._names):
+            for gram in trigrams(name):
+                self._trigrams.setdefault(gram, set()).add(entry_id)
+
+    @staticmethod
+    def _word_starts(name: str) -> List[int]:
+        return [0] + [i + 1 for i, char in enumerate(name) if char == " "]
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[str, str]]:
+        """Return up to ``limit`` ``(district, region)`` pairs, best matches first.
+
+        A query with nothing left after normalizing (blank, or only apostrophes) matches nothing.
+        """
+        query = normalize(query)
+        if not query:
+            return []
+
+        best: Dict[int, int] = {}
+        i = bisect_left(self._keys, query)
+        while i < len(self._keys) and self._keys[i].startswith(query):
+            rank, entry_id = self._refs[i]
+            if rank < best.get(entry_id, SUBSTRING + 1):
+                best[entry_id] = rank
+            i += 1
+
+        if len(best) < limit and len(query) >= 3:
+            postings = sorted((self._trigrams.get(gram, set()) for gram in trigrams(query)), key=len)
+            candidates = set.intersection(*postings) if postings else set()
+            for entry_id in candidates:
+                if entry_id not in best and query in self._names[entry_id]:
+                    best[entry_id] = SUBSTRING
+
+        ranked = sorted(best, key=lambda entry_id: (best[entry_id], self._names[entry_id]))
+        return [self.entries[entry_id] for entry_id in ranked[:limit]]
@@ -0,0 +1,97 @@
+from datetime import datetime
+
+from alerts import AlertEngine, valid_threshold
+from forecast import CurrentWeather, Forecast, HourlySeries
+
+LOCATION = 'Chilonzor'
+NOW = 1_700_000_000
+
+
+def make_forecast(temps, rain) -> Forecast:
+    hourly = HourlySeries()
+    for i, (temp, chance) in enumerate(zip(temps, rain)):
+        hourly.append({
+            'time_epoch': NOW + i * 3600,
+            'temp_c': temp,
+            'feelslike_c': temp,
+            'condition': {'text': 'Sunny', 'code': 1000},
+            'humidity': 50,
+            'wind_kph': 5.0,
+            'pressure_mb': 1015.0,
+            'cloud': 0,
+            'chance_of_rain': chance,
+        })
+    current = CurrentWeather(temps[0], temps[0], 'Sunny', 1000, 50, 5.0, 1015.0, 0)
+    return Forecast(LOCATION, current, (), hourly, datetime(2024, 1, 1))
+
+
+def flat(temp=10.0, rain=0):
+    return make_forecast([temp] * 12, [rain] * 12)
+
+
+def alerted(alerts, kind):
+    return sorted(alert.user_id for alert in alerts if alert.kind == kind)
+
+
+def test_rain_alerts_users_whose_threshold_was_crossed_upwards():
+    engine = AlertEngine()
+    for user_id, threshold in [(1, 50.0), (2, 80.0), (3, 95.0)]:
+        engine.set_rule(user_id, LOCATION, 'rain', threshold)
+
+    assert engine.evaluate(LOCATION, flat(rain=10), NOW) == []
+    assert alerted(engine.evaluate(LOCATION, flat(rain=85), NOW), 'rain') == [1, 2]
+    # Already active users are not alerted again; the next threshold up is
+    assert alerted(engine.evaluate(LOCATION, flat(rain=95), NOW), 'rain') == [3]
+    # Falling rain chance clears rules without alerting
+    assert engine.evaluate(LOCATION, flat(rain=0), NOW) == []
+
+
+def test_frost_alerts_users_whose_threshold_was_crossed_downwards():
+    engine = AlertEngine()
+    engine.set_rule(1, LOCATION, 'frost', 0.0)
+    engine.set_rule(2, LOCATION, 'frost', -5.0)
+
+    engine.evaluate(LOCATION, flat(temp=5.0), NOW)
+    alerts = engine.evaluate(LOCATION, make_forecast([5.0] * 6 + [-2.0] * 6, [0] * 12), NOW)
+    assert alerted(alerts, 'frost') == [1]
+    assert alerts[0].value == -2.0
+
+
+def test_first_snapshot_is_a_baseline():
+    engine = AlertEngine()
+    engine.set_rule(1, LOCATION, 'rain', 50.0)
+    assert engine.evaluate(LOCATION, flat(rain=90), NOW) == []
+
+
+def test_unchanged_features_do_not_alert():
+    engine = AlertEngine()
+    engine.set_rule(1, LOCATION, 'rain', 50.0)
+    engine.evaluate(LOCATION, flat(rain=10), NOW)
+    engine.evaluate(LOCATION, flat(rain=90), NOW)
+    assert engine.evaluate(LOCATION, flat(rain=90), NOW) == []
+
+
+def test_last_unsubscribe_drops_the_district_snapshot():
+    engine = AlertEngine()
+    engine.set_rule(1, LOCATION, 'rain', 50.0)
+    engine.evaluate(LOCATION, flat(rain=10), NOW)
+
+    engine.remove_user(1)
+    assert engine.locations() == []
+
+    # Resubscribing starts from a fresh baseline instead of diffing against stale data
+    engine.set_rule(1, LOCATION, 'rain', 50.0)
+    assert engine.evaluate(LOCATION, flat(rain=90), NOW) == []
+
+
+def test_invalid_thresholds_are_rejected():
+    assert not valid_threshold('rain', float('nan'))
+    assert not valid_threshold('frost', float('-inf'))
+    assert not valid_threshold('rain', 150.0)
+    assert not valid_threshold('swing', 0.0)
+    assert valid_threshold('frost', -5.5)
+
+    engine = AlertEngine()
+    engine.load([(1, LOCATION, 'rain', float('nan')), (2, LOCATION, 'rain', 60.0)])
+    assert engine.rules_for(1) == {}
+    assert engine.rules_for(2) == {'rain': (LOCATION, 60.0)}
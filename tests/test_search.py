@@ -0,0 +1,32 @@
+from regions import UZBEKISTAN_REGIONS
+from search import DistrictIndex, normalize
+
+INDEX = DistrictIndex(UZBEKISTAN_REGIONS)
+
+
+def names(query, limit=20):
+    return [district for district, _ in INDEX.search(query, limit)]
+
+
+def test_apostrophe_variants_find_the_same_district():
+    assert normalize("Qo'qon") == normalize("Qo‘qon") == normalize("qoqon") == normalize("QOʻQON")
+    for query in ["Qo'qon", "Qo‘qon", "Qoʼqon", "qoqon"]:
+        assert names(query)[0] == "Qo'qon"
+
+
+def test_exact_prefix_ranks_before_word_prefix_and_substring():
+    found = names("samarqand")
+    assert found[:2] == ["Samarqand", "Samarqand shahri"]
+
+
+def test_mid_word_fragment_matches_by_substring():
+    assert "Chilonzor" in names("lonz")
+
+
+def test_query_without_letters_matches_nothing():
+    for query in ["", "   ", "'", "ʻ", "' ‘"]:
+        assert INDEX.search(query) == []
+
+
+def test_limit_is_respected():
+    assert len(INDEX.search("a", limit=3)) == 3